@@ -13,7 +13,7 @@ import sys
 import os
 import argparse
 import hashlib
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 def extract_sections(gcode_content: str) -> Tuple[str, str, str, str, str]:
     """
@@ -191,11 +191,17 @@ def add_md5_checksum(gcode_file: str) -> bool:
         print(f"Error adding MD5 checksum: {e}")
         return False
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """
     Main function for post-processing script
+
+    Args:
+        argv: Command line arguments, excluding the program name (defaults to sys.argv[1:])
     """
 
+    if argv is None:
+        argv = sys.argv[1:]
+
     # Set up argument parser
     parser = argparse.ArgumentParser(
         description='Post-processing script for OrcaSlicer to convert G-code format to Orca-FlashForge',
@@ -212,11 +218,11 @@ Examples:
                         help='Add MD5 checksum for forge-x firmware compatibility')
 
     # Parse arguments (support both argparse and OrcaSlicer's positional args)
-    if len(sys.argv) == 2 and not sys.argv[1].startswith('-'):
+    if len(argv) == 1 and not argv[0].startswith('-'):
         # OrcaSlicer only passes filename, no flags
-        args = parser.parse_args([sys.argv[1]])
+        args = parser.parse_args([argv[0]])
     else:
-        args = parser.parse_args()
+        args = parser.parse_args(argv)
 
     gcode_file = args.gcode_file
 
@@ -5,12 +5,178 @@ Validates that the conversion produces correctly structured G-code files.
 """
 
 import unittest
+import argparse
 import os
 import shutil
 import subprocess
 import sys
 import hashlib
-from typing import List, Dict, Optional
+import functools
+import tempfile
+import io
+import contextlib
+import importlib.util
+from typing import List, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONVERT_SCRIPT = os.path.join(os.path.dirname(SCRIPT_DIR), "convert.py")
+TEST_FIXTURE = os.path.join(SCRIPT_DIR, "test.gcode")
+
+# Critical metadata fields that must sit between the header and config blocks
+METADATA_FIELDS = (
+    '; filament used [mm]',
+    '; filament used [g]',
+    '; total filament used [g]',
+    '; estimated printing time (normal mode)',
+)
+
+# Block boundary markers, keyed by the names used in block position lookups
+BLOCK_MARKERS = (
+    ('header_start', '; HEADER_BLOCK_START'),
+    ('header_end', '; HEADER_BLOCK_END'),
+    ('config_start', '; CONFIG_BLOCK_START'),
+    ('config_end', '; CONFIG_BLOCK_END'),
+    ('thumbnail_start', '; THUMBNAIL_BLOCK_START'),
+    ('thumbnail_end', '; THUMBNAIL_BLOCK_END'),
+)
+
+# Every marker recorded by the marker index
+SCAN_TARGETS = frozenset(METADATA_FIELDS + tuple(marker for _, marker in BLOCK_MARKERS))
+
+
+def _fast_copy(src: str, dst: str) -> None:
+    """
+    Copy a file, preferring a copy-on-write clone where the filesystem supports it.
+
+    A hard link is not safe here: convert.py rewrites the file in place, which would
+    modify the fixture through the link.
+    """
+    # fcntl exposes FICLONE on Linux with Python 3.12+; elsewhere just copy
+    if hasattr(fcntl, 'FICLONE'):
+        try:
+            with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+                fcntl.ioctl(dst_file.fileno(), fcntl.FICLONE, src_file.fileno())
+            return
+        except OSError:
+            # Not a reflink-capable filesystem (e.g. ext4, tmpfs) or a cross-device copy
+            pass
+
+    # Fall back to a regular copy, which uses sendfile on Linux
+    shutil.copy2(src, dst)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_convert_module():
+    """Import convert.py once as a module so it can be driven without a subprocess."""
+    spec = importlib.util.spec_from_file_location("convert", CONVERT_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@functools.lru_cache(maxsize=None)
+def _converted_bytes(extra_args: Tuple[str, ...]) -> bytes:
+    """
+    Convert a fresh copy of the test fixture with the given flags and return the result.
+
+    Cached per flag combination so every test class shares a single conversion run.
+    """
+    temp_dir = tempfile.mkdtemp(prefix='orca2flashforge_test_')
+    temp_gcode = os.path.join(temp_dir, "test.gcode")
+
+    try:
+        # Copy test fixture to temp file
+        _fast_copy(TEST_FIXTURE, temp_gcode)
+
+        # Call convert.main() in-process, capturing its progress messages
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                _load_convert_module().main([temp_gcode, *extra_args])
+                returncode = 0
+            except SystemExit as e:
+                returncode = e.code
+
+        if returncode:
+            raise RuntimeError(f"Conversion script failed: {output.getvalue()}")
+
+        with open(temp_gcode, 'rb') as f:
+            return f.read()
+    finally:
+        # Removes the converted file and the .backup written next to it
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _find_marker_offsets(raw: bytes) -> Dict[str, List[int]]:
+    """Map each indexed marker to the byte offsets of the lines it starts."""
+    index = {}
+    for marker in SCAN_TARGETS:
+        needle = marker.encode('ascii')
+        offsets = []
+        pos = raw.find(needle)
+        while pos >= 0:
+            end = pos + len(needle)
+            # Only whole keys at the start of a line count: "; key" or "; key = value"
+            if (pos == 0 or raw[pos - 1] == 0x0A) and raw[end:end + 1] in (b'', b'\r', b'\n', b' '):
+                offsets.append(pos)
+            pos = raw.find(needle, end)
+        if offsets:
+            index[marker] = offsets
+    return index
+
+
+def _count_nonblank_lines(raw: bytes) -> int:
+    """Count lines that contain anything other than whitespace."""
+    return sum(1 for line in raw.splitlines() if line.strip())
+
+
+def _parse_converted(raw: bytes) -> Tuple[Dict[str, List[int]], int, Optional[bytes]]:
+    """
+    Parse converted G-code into the artifacts the tests inspect.
+
+    Returns: (marker line index, non-blank line count, header block bytes or None)
+    """
+    marker_offsets = _find_marker_offsets(raw)
+    marker_index = {
+        marker: [raw.count(b'\n', 0, offset) for offset in offsets]
+        for marker, offsets in marker_offsets.items()
+    }
+
+    header_start = marker_offsets.get('; HEADER_BLOCK_START')
+    header_end = marker_offsets.get('; HEADER_BLOCK_END')
+    header_block = raw[header_start[0]:header_end[0]] if header_start and header_end else None
+
+    return marker_index, _count_nonblank_lines(raw), header_block
+
+
+@functools.lru_cache(maxsize=None)
+def _converted_digest(extra_args: Tuple[str, ...]) -> bytes:
+    """Digest of the converted output for a flag combination, hashed once per combination."""
+    return hashlib.blake2b(_converted_bytes(extra_args), digest_size=16).digest()
+
+
+# Parsed converter output keyed by content digest; at most one entry per distinct output
+_parsed_by_digest = {}
+
+
+def _parsed_output(extra_args: Tuple[str, ...]) -> Tuple[Dict[str, List[int]], int, Optional[bytes]]:
+    """
+    Parse the converted output for a flag combination.
+
+    Memoized by content digest, so flag combinations that produce identical output
+    (such as -m and --add-md5) are only parsed once.
+    """
+    digest = _converted_digest(extra_args)
+    parsed = _parsed_by_digest.get(digest)
+    if parsed is None:
+        parsed = _parsed_by_digest[digest] = _parse_converted(_converted_bytes(extra_args))
+    return parsed
 
 
 class TestOrcaToFlashForgeConversion(unittest.TestCase):
@@ -19,9 +185,9 @@ class TestOrcaToFlashForgeConversion(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up test fixtures and paths."""
-        cls.script_dir = os.path.dirname(os.path.abspath(__file__))
-        cls.convert_script = os.path.join(os.path.dirname(cls.script_dir), "convert.py")
-        cls.test_fixture = os.path.join(cls.script_dir, "test.gcode")
+        cls.script_dir = SCRIPT_DIR
+        cls.convert_script = CONVERT_SCRIPT
+        cls.test_fixture = TEST_FIXTURE
 
         # Verify required files exist
         if not os.path.exists(cls.convert_script):
@@ -29,119 +195,41 @@ class TestOrcaToFlashForgeConversion(unittest.TestCase):
         if not os.path.exists(cls.test_fixture):
             raise FileNotFoundError(f"Test fixture not found: {cls.test_fixture}")
 
-    def setUp(self):
-        """Create a temporary copy of the test fixture for each test."""
-        self.temp_gcode = os.path.join(self.script_dir, "temp_test.gcode")
-        self.temp_backup = self.temp_gcode + ".backup"
-
-        # Copy test fixture to temp file
-        shutil.copy2(self.test_fixture, self.temp_gcode)
-
-        # Run the conversion script
-        result = subprocess.run(
-            [sys.executable, self.convert_script, self.temp_gcode],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            raise RuntimeError(f"Conversion script failed: {result.stderr}")
+        # The fixture never changes, so count its non-blank lines once for the data loss check
+        with open(cls.test_fixture, 'rb') as f:
+            cls.original_nonblank_lines = _count_nonblank_lines(f.read())
 
-        # Read the converted content
-        with open(self.temp_gcode, 'r', encoding='utf-8') as f:
-            self.converted_content = f.read()
-
-        self.converted_lines = self.converted_content.split('\n')
-
-    def tearDown(self):
-        """Clean up temporary files."""
-        if os.path.exists(self.temp_gcode):
-            os.remove(self.temp_gcode)
-        if os.path.exists(self.temp_backup):
-            os.remove(self.temp_backup)
+        # Keep only the parsed artifacts the tests need, not the converted bytes
+        cls._marker_index, cls.converted_nonblank_lines, cls.header_block = _parsed_output(())
 
     def _find_line_index(self, search_text: str) -> Optional[int]:
-        """Find the index of a line containing the search text."""
-        for i, line in enumerate(self.converted_lines):
-            if search_text in line:
-                return i
-        return None
+        """Find the index of the first line carrying the given marker."""
+        indices = self._marker_index.get(search_text)
+        return indices[0] if indices else None
 
     def _find_all_line_indices(self, search_text: str) -> List[int]:
-        """Find all indices of lines containing the search text."""
-        indices = []
-        for i, line in enumerate(self.converted_lines):
-            if search_text in line:
-                indices.append(i)
-        return indices
+        """Find all indices of lines carrying the given marker."""
+        return list(self._marker_index.get(search_text, ()))
 
     def _get_block_positions(self) -> Dict[str, Optional[int]]:
         """Get the line positions of all major blocks."""
-        return {
-            'header_start': self._find_line_index('; HEADER_BLOCK_START'),
-            'header_end': self._find_line_index('; HEADER_BLOCK_END'),
-            'config_start': self._find_line_index('; CONFIG_BLOCK_START'),
-            'config_end': self._find_line_index('; CONFIG_BLOCK_END'),
-            'thumbnail_start': self._find_line_index('; THUMBNAIL_BLOCK_START'),
-            'thumbnail_end': self._find_line_index('; THUMBNAIL_BLOCK_END'),
-        }
+        return {key: self._find_line_index(marker) for key, marker in BLOCK_MARKERS}
 
     # ========== Block Structure Tests ==========
 
-    def test_header_block_exists(self):
-        """Test that HEADER_BLOCK_START and HEADER_BLOCK_END exist."""
+    def test_blocks_exist(self):
+        """Test that the HEADER, CONFIG and THUMBNAIL blocks each have START and END markers in order."""
         positions = self._get_block_positions()
 
-        self.assertIsNotNone(
-            positions['header_start'],
-            "Missing ; HEADER_BLOCK_START"
-        )
-        self.assertIsNotNone(
-            positions['header_end'],
-            "Missing ; HEADER_BLOCK_END"
-        )
-        self.assertLess(
-            positions['header_start'],
-            positions['header_end'],
-            "HEADER_BLOCK_START should come before HEADER_BLOCK_END"
-        )
-
-    def test_config_block_exists(self):
-        """Test that CONFIG_BLOCK_START and CONFIG_BLOCK_END exist."""
-        positions = self._get_block_positions()
-
-        self.assertIsNotNone(
-            positions['config_start'],
-            "Missing ; CONFIG_BLOCK_START"
-        )
-        self.assertIsNotNone(
-            positions['config_end'],
-            "Missing ; CONFIG_BLOCK_END"
-        )
-        self.assertLess(
-            positions['config_start'],
-            positions['config_end'],
-            "CONFIG_BLOCK_START should come before CONFIG_BLOCK_END"
-        )
+        for block in ('header', 'config', 'thumbnail'):
+            with self.subTest(block=block):
+                name = f"{block.upper()}_BLOCK"
+                start = positions[f'{block}_start']
+                end = positions[f'{block}_end']
 
-    def test_thumbnail_block_exists(self):
-        """Test that THUMBNAIL_BLOCK exists and is properly formed."""
-        positions = self._get_block_positions()
-
-        # Require thumbnail block to exist
-        self.assertIsNotNone(
-            positions['thumbnail_start'],
-            "Missing ; THUMBNAIL_BLOCK_START"
-        )
-        self.assertIsNotNone(
-            positions['thumbnail_end'],
-            "Missing ; THUMBNAIL_BLOCK_END"
-        )
-        self.assertLess(
-            positions['thumbnail_start'],
-            positions['thumbnail_end'],
-            "THUMBNAIL_BLOCK_START should come before THUMBNAIL_BLOCK_END"
-        )
+                self.assertIsNotNone(start, f"Missing ; {name}_START")
+                self.assertIsNotNone(end, f"Missing ; {name}_END")
+                self.assertLess(start, end, f"{name}_START should come before {name}_END")
 
     def test_block_ordering(self):
         """Test that blocks appear in the correct order: Header → Metadata → Config → Thumbnail → Executable."""
@@ -150,57 +238,27 @@ class TestOrcaToFlashForgeConversion(unittest.TestCase):
         # Header should come first
         self.assertIsNotNone(positions['header_start'], "Missing header block")
 
-        # Find first metadata line (should be after header, before config)
-        metadata_fields = [
-            '; filament used [mm]',
-            '; filament used [g]',
-            '; total filament used [g]',
-            '; estimated printing time (normal mode)'
-        ]
-
-        metadata_positions = []
-        for field in metadata_fields:
-            pos = self._find_line_index(field)
-            if pos is not None:
-                metadata_positions.append(pos)
-
-        if metadata_positions:
-            first_metadata_pos = min(metadata_positions)
-
-            # Metadata should come after header
-            self.assertLess(
-                positions['header_end'],
-                first_metadata_pos,
-                "Metadata should come after HEADER_BLOCK_END"
-            )
+        metadata_positions = [pos for pos in map(self._find_line_index, METADATA_FIELDS) if pos is not None]
 
-            # Metadata should come before config
-            self.assertLess(
-                first_metadata_pos,
-                positions['config_start'],
-                "Metadata should come before CONFIG_BLOCK_START"
-            )
+        # (name, first line, last line) in expected order; absent sections are skipped
+        sections = [
+            ('HEADER_BLOCK', positions['header_start'], positions['header_end']),
+            ('Metadata', min(metadata_positions, default=None), max(metadata_positions, default=None)),
+            ('CONFIG_BLOCK', positions['config_start'], positions['config_end']),
+            ('THUMBNAIL_BLOCK', positions['thumbnail_start'], positions['thumbnail_end']),
+        ]
+        present = [section for section in sections if section[1] is not None]
 
-        # Config should come before thumbnail (if thumbnail exists)
-        if positions['thumbnail_start'] is not None:
-            self.assertLess(
-                positions['config_end'],
-                positions['thumbnail_start'],
-                "CONFIG_BLOCK should come before THUMBNAIL_BLOCK"
-            )
+        for (prev_name, _, prev_last), (name, first, _) in zip(present, present[1:]):
+            with self.subTest(section=name):
+                self.assertIsNotNone(prev_last, f"Missing end of {prev_name}")
+                self.assertLess(prev_last, first, f"{prev_name} should come before {name}")
 
     # ========== Metadata Validation Tests ==========
 
     def test_metadata_fields_present(self):
         """Test that critical metadata fields are present."""
-        required_fields = [
-            '; filament used [mm]',
-            '; filament used [g]',
-            '; total filament used [g]',
-            '; estimated printing time (normal mode)'
-        ]
-
-        for field in required_fields:
+        for field in METADATA_FIELDS:
             with self.subTest(field=field):
                 pos = self._find_line_index(field)
                 self.assertIsNotNone(
@@ -215,14 +273,7 @@ class TestOrcaToFlashForgeConversion(unittest.TestCase):
 
         self.assertIsNotNone(config_start, "Missing CONFIG_BLOCK_START")
 
-        metadata_fields = [
-            '; filament used [mm]',
-            '; filament used [g]',
-            '; total filament used [g]',
-            '; estimated printing time (normal mode)'
-        ]
-
-        for field in metadata_fields:
+        for field in METADATA_FIELDS:
             with self.subTest(field=field):
                 pos = self._find_line_index(field)
                 if pos is not None:
@@ -239,14 +290,7 @@ class TestOrcaToFlashForgeConversion(unittest.TestCase):
 
         self.assertIsNotNone(header_end, "Missing HEADER_BLOCK_END")
 
-        metadata_fields = [
-            '; filament used [mm]',
-            '; filament used [g]',
-            '; total filament used [g]',
-            '; estimated printing time (normal mode)'
-        ]
-
-        for field in metadata_fields:
+        for field in METADATA_FIELDS:
             with self.subTest(field=field):
                 pos = self._find_line_index(field)
                 if pos is not None:
@@ -261,18 +305,12 @@ class TestOrcaToFlashForgeConversion(unittest.TestCase):
     def test_header_contains_generated_by(self):
         """Test that the header block contains a 'generated by' line."""
         positions = self._get_block_positions()
-        header_start = positions['header_start']
-        header_end = positions['header_end']
 
-        self.assertIsNotNone(header_start, "Missing HEADER_BLOCK_START")
-        self.assertIsNotNone(header_end, "Missing HEADER_BLOCK_END")
+        self.assertIsNotNone(positions['header_start'], "Missing HEADER_BLOCK_START")
+        self.assertIsNotNone(positions['header_end'], "Missing HEADER_BLOCK_END")
 
         # Search within header block
-        found_generated_by = False
-        for i in range(header_start, header_end + 1):
-            if 'generated by' in self.converted_lines[i].lower():
-                found_generated_by = True
-                break
+        found_generated_by = b'generated by' in self.header_block.lower()
 
         self.assertTrue(
             found_generated_by,
@@ -283,20 +321,16 @@ class TestOrcaToFlashForgeConversion(unittest.TestCase):
 
     def test_no_data_loss(self):
         """Test that no significant content was lost during conversion."""
-        # Read original file
-        with open(self.test_fixture, 'r', encoding='utf-8') as f:
-            original_content = f.read()
-
-        original_lines = [line.strip() for line in original_content.split('\n') if line.strip()]
-        converted_lines = [line.strip() for line in self.converted_content.split('\n') if line.strip()]
+        original_count = self.original_nonblank_lines
+        converted_count = self.converted_nonblank_lines
 
-        # Allow for minor line count differences due to formatting
-        line_diff = abs(len(original_lines) - len(converted_lines))
+        # Allow for minor non-blank line count differences due to formatting
+        line_diff = abs(original_count - converted_count)
 
         self.assertLess(
             line_diff,
             10,
-            f"Significant difference in line count: original={len(original_lines)}, converted={len(converted_lines)}"
+            f"Significant difference in line count: original={original_count}, converted={converted_count}"
         )
 
 
@@ -305,10 +339,10 @@ class TestMD5Checksum(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        """Set up test fixtures and paths."""
-        cls.script_dir = os.path.dirname(os.path.abspath(__file__))
-        cls.convert_script = os.path.join(os.path.dirname(cls.script_dir), "convert.py")
-        cls.test_fixture = os.path.join(cls.script_dir, "test.gcode")
+        """Set up test fixtures and run each flag combination once."""
+        cls.script_dir = SCRIPT_DIR
+        cls.convert_script = CONVERT_SCRIPT
+        cls.test_fixture = TEST_FIXTURE
 
         # Verify required files exist
         if not os.path.exists(cls.convert_script):
@@ -316,97 +350,61 @@ class TestMD5Checksum(unittest.TestCase):
         if not os.path.exists(cls.test_fixture):
             raise FileNotFoundError(f"Test fixture not found: {cls.test_fixture}")
 
-    def setUp(self):
-        """Create a temporary copy of the test fixture for each test."""
-        self.temp_gcode = os.path.join(self.script_dir, "temp_md5_test.gcode")
-        self.temp_backup = self.temp_gcode + ".backup"
+        # Full bytes are only needed for the checksum validity test; the other
+        # flag combinations are checked through their first line alone
+        cls.md5_content = _converted_bytes(('--add-md5',))
+        cls.md5_short_first_line = cls._first_line(_converted_bytes(('-m',)))
+        cls.plain_first_line = cls._first_line(_converted_bytes(()))
 
-    def tearDown(self):
-        """Clean up temporary files."""
-        if os.path.exists(self.temp_gcode):
-            os.remove(self.temp_gcode)
-        if os.path.exists(self.temp_backup):
-            os.remove(self.temp_backup)
+    @staticmethod
+    def _first_line(content: bytes) -> bytes:
+        """Return the first line of the content, without its line ending."""
+        end = content.find(b'\n')
+        return (content if end < 0 else content[:end]).rstrip(b'\r')
 
     def test_md5_flag_adds_checksum(self):
         """Test that --add-md5 flag adds MD5 checksum to the beginning of the file."""
-        # Copy test fixture to temp file
-        shutil.copy2(self.test_fixture, self.temp_gcode)
-
-        # Run the conversion script with --add-md5 flag
-        result = subprocess.run(
-            [sys.executable, self.convert_script, self.temp_gcode, '--add-md5'],
-            capture_output=True,
-            text=True
-        )
-
-        self.assertEqual(result.returncode, 0, f"Script failed: {result.stderr}")
-
-        # Read the converted content
-        with open(self.temp_gcode, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        lines = content.split('\n')
+        first_line = self._first_line(self.md5_content)
 
         # First line should be MD5 checksum
         self.assertTrue(
-            lines[0].startswith('; MD5:'),
-            f"First line should start with '; MD5:', got: {lines[0]}"
+            first_line.startswith(b'; MD5:'),
+            f"First line should start with '; MD5:', got: {first_line.decode('utf-8', 'replace')}"
         )
 
     def test_md5_checksum_format(self):
         """Test that MD5 checksum has the correct format."""
-        # Copy test fixture to temp file
-        shutil.copy2(self.test_fixture, self.temp_gcode)
-
-        # Run the conversion script with --add-md5 flag
-        result = subprocess.run(
-            [sys.executable, self.convert_script, self.temp_gcode, '--add-md5'],
-            capture_output=True,
-            text=True
-        )
-
-        self.assertEqual(result.returncode, 0, f"Script failed: {result.stderr}")
-
-        # Read the first line
-        with open(self.temp_gcode, 'r', encoding='utf-8') as f:
-            first_line = f.readline().strip()
+        first_line = self._first_line(self.md5_content).strip()
 
         # Verify format: "; MD5:" followed by 32 hex characters
-        self.assertTrue(first_line.startswith('; MD5:'))
-        md5_hash = first_line[6:]  # Remove "; MD5:" prefix
+        self.assertTrue(first_line.startswith(b'; MD5:'))
+        md5_hash = first_line[6:].decode('ascii', 'replace')  # Remove "; MD5:" prefix
 
         self.assertEqual(len(md5_hash), 32, f"MD5 hash should be 32 characters, got {len(md5_hash)}")
+
+        # 32 characters decoding to 16 bytes rules out the whitespace bytes.fromhex tolerates
+        try:
+            hex_ok = len(bytes.fromhex(md5_hash)) == 16
+        except ValueError:
+            hex_ok = False
+
         self.assertTrue(
-            all(c in '0123456789abcdef' for c in md5_hash.lower()),
+            hex_ok,
             f"MD5 hash should only contain hex characters, got: {md5_hash}"
         )
 
     def test_md5_checksum_validity(self):
         """Test that the MD5 checksum is correctly calculated."""
-        # Copy test fixture to temp file
-        shutil.copy2(self.test_fixture, self.temp_gcode)
-
-        # Run the conversion script with --add-md5 flag
-        result = subprocess.run(
-            [sys.executable, self.convert_script, self.temp_gcode, '--add-md5'],
-            capture_output=True,
-            text=True
-        )
-
-        self.assertEqual(result.returncode, 0, f"Script failed: {result.stderr}")
-
-        # Read the file
-        with open(self.temp_gcode, 'rb') as f:
-            content = f.read()
+        content = self.md5_content
 
         # Extract MD5 from first line
-        first_line = content.split(b'\n')[0].decode('utf-8')
-        expected_md5 = first_line[6:]  # Remove "; MD5:" prefix
+        body_start = content.find(b'\n') + 1
+        expected_md5 = content[6:body_start].rstrip(b'\r\n').decode('ascii')  # Remove "; MD5:" prefix
 
-        # Calculate MD5 of the rest of the file (excluding the MD5 line)
-        content_without_md5 = content.split(b'\n', 1)[1]
-        calculated_md5 = hashlib.md5(content_without_md5).hexdigest()
+        # Calculate MD5 of the rest of the file (excluding the MD5 line) without copying it
+        md5 = hashlib.md5()
+        md5.update(memoryview(content)[body_start:])
+        calculated_md5 = md5.hexdigest()
 
         self.assertEqual(
             expected_md5,
@@ -416,84 +414,32 @@ class TestMD5Checksum(unittest.TestCase):
 
     def test_without_md5_flag_no_checksum(self):
         """Test that without --add-md5 flag, no MD5 checksum is added."""
-        # Copy test fixture to temp file
-        shutil.copy2(self.test_fixture, self.temp_gcode)
-
-        # Run the conversion script WITHOUT --add-md5 flag
-        result = subprocess.run(
-            [sys.executable, self.convert_script, self.temp_gcode],
-            capture_output=True,
-            text=True
-        )
-
-        self.assertEqual(result.returncode, 0, f"Script failed: {result.stderr}")
-
-        # Read the converted content
-        with open(self.temp_gcode, 'r', encoding='utf-8') as f:
-            first_line = f.readline().strip()
+        first_line = self.plain_first_line
 
         # First line should NOT be MD5 checksum
         self.assertFalse(
-            first_line.startswith('; MD5:'),
-            f"Without --add-md5 flag, first line should not be MD5 checksum, got: {first_line}"
+            first_line.startswith(b'; MD5:'),
+            f"Without --add-md5 flag, first line should not be MD5 checksum, got: {first_line.decode('utf-8', 'replace')}"
         )
 
     def test_md5_short_flag(self):
         """Test that -m short flag works the same as --add-md5."""
-        # Copy test fixture to temp file
-        shutil.copy2(self.test_fixture, self.temp_gcode)
-
-        # Run the conversion script with -m flag
-        result = subprocess.run(
-            [sys.executable, self.convert_script, self.temp_gcode, '-m'],
-            capture_output=True,
-            text=True
-        )
-
-        self.assertEqual(result.returncode, 0, f"Script failed: {result.stderr}")
-
-        # Read the converted content
-        with open(self.temp_gcode, 'r', encoding='utf-8') as f:
-            first_line = f.readline().strip()
+        first_line = self.md5_short_first_line
 
         # First line should be MD5 checksum
         self.assertTrue(
-            first_line.startswith('; MD5:'),
-            f"First line should start with '; MD5:' when using -m flag, got: {first_line}"
+            first_line.startswith(b'; MD5:'),
+            f"First line should start with '; MD5:' when using -m flag, got: {first_line.decode('utf-8', 'replace')}"
         )
 
     def test_md5_preserves_flashforge_metadata(self):
         """Test that MD5 generation preserves FlashForge-specific metadata structure."""
-        # Copy test fixture to temp file
-        shutil.copy2(self.test_fixture, self.temp_gcode)
-
-        # Run the conversion script with --add-md5 flag
-        result = subprocess.run(
-            [sys.executable, self.convert_script, self.temp_gcode, '--add-md5'],
-            capture_output=True,
-            text=True
-        )
-
-        self.assertEqual(result.returncode, 0, f"Script failed: {result.stderr}")
-
-        # Read the converted content
-        with open(self.temp_gcode, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        lines = content.split('\n')
+        marker_index, _, _ = _parsed_output(('--add-md5',))
 
         # Find positions of key blocks (skip first line which is MD5)
-        header_start = None
-        config_start = None
-        thumbnail_start = None
-
-        for i, line in enumerate(lines):
-            if '; HEADER_BLOCK_START' in line:
-                header_start = i
-            elif '; CONFIG_BLOCK_START' in line:
-                config_start = i
-            elif '; THUMBNAIL_BLOCK_START' in line:
-                thumbnail_start = i
+        header_start = marker_index.get('; HEADER_BLOCK_START', [None])[0]
+        config_start = marker_index.get('; CONFIG_BLOCK_START', [None])[0]
+        thumbnail_start = marker_index.get('; THUMBNAIL_BLOCK_START', [None])[0]
 
         # Verify that header comes after MD5 line
         self.assertIsNotNone(header_start, "Missing HEADER_BLOCK_START")
@@ -506,18 +452,64 @@ class TestMD5Checksum(unittest.TestCase):
         self.assertLess(config_start, thumbnail_start, "Config should come before thumbnail")
 
 
-def run_tests():
+class TestCommandLine(unittest.TestCase):
+    """Smoke test for running convert.py as a script, the way OrcaSlicer invokes it."""
+
+    def test_script_converts_file(self):
+        """Test that 'python convert.py <file>' succeeds and matches the in-process conversion."""
+        with tempfile.TemporaryDirectory(prefix='orca2flashforge_test_') as temp_dir:
+            temp_gcode = os.path.join(temp_dir, "test.gcode")
+            _fast_copy(TEST_FIXTURE, temp_gcode)
+
+            # OrcaSlicer passes only the file name
+            result = subprocess.run(
+                [sys.executable, CONVERT_SCRIPT, temp_gcode],
+                capture_output=True,
+                text=True
+            )
+
+            self.assertEqual(result.returncode, 0, f"Script failed: {result.stdout}{result.stderr}")
+
+            with open(temp_gcode, 'rb') as f:
+                converted = f.read()
+
+        self.assertEqual(
+            converted,
+            _converted_bytes(()),
+            "Running convert.py as a script should produce the same output as calling main()"
+        )
+
+
+def run_tests(argv: Optional[List[str]] = None):
     """Run the test suite."""
-    # Create test suite
+    parser = argparse.ArgumentParser(description='Run the orca2flashforge conversion tests')
+    parser.add_argument('-k', dest='patterns', action='append', default=[],
+                        help='Only run tests whose name matches this substring or pattern (repeatable)')
+    parser.add_argument('-v', '--verbose', dest='verbosity', action='store_const', const=2, default=2,
+                        help='Accepted for compatibility; output is already verbose by default')
+    parser.add_argument('-q', '--quiet', dest='verbosity', action='store_const', const=0,
+                        help='Minimal output')
+    parser.add_argument('--no-failfast', dest='failfast', action='store_false',
+                        default=os.environ.get('FAILFAST', '1') == '1',
+                        help='By default the whole run stops at the first failing test; '
+                             'keep running every test instead (or set FAILFAST=0)')
+    args = parser.parse_args(argv)
+
     loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
+    # Same matching rules as "python -m unittest -k"
+    loader.testNamePatterns = [
+        pattern if '*' in pattern else f'*{pattern}*' for pattern in args.patterns
+    ] or None
+
+    # Collect every TestCase in this module; classes without matching tests never run their setUpClass
+    suite = loader.loadTestsFromModule(sys.modules[__name__])
 
-    # Add test classes
-    suite.addTests(loader.loadTestsFromTestCase(TestOrcaToFlashForgeConversion))
-    suite.addTests(loader.loadTestsFromTestCase(TestMD5Checksum))
+    if not suite.countTestCases():
+        print("No tests matched", file=sys.stderr)
+        return 1
 
     # Run with verbose output
-    runner = unittest.TextTestRunner(verbosity=2)
+    runner = unittest.TextTestRunner(verbosity=args.verbosity, failfast=args.failfast)
     result = runner.run(suite)
 
     # Return exit code